@@ -8,11 +8,18 @@ The cool part? Your questions get turned into database queries automatically!
 
 import streamlit as st
 import sqlite3
-import pandas as pd
 import logging
 import json
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
+import sqlglot
+from sqlglot import exp
+from sqlglot.errors import SqlglotError
+from sqlglot.tokens import TokenType
 from openai import OpenAI
+from diskcache import Cache
 from dotenv import load_dotenv
 import os
 
@@ -27,46 +34,190 @@ logger = logging.getLogger(__name__)
 # Load your OpenAI API key from the .env file
 load_dotenv()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-client = OpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
+
+
+@st.cache_resource
+def get_openai():
+    """
+    Create the OpenAI client once and reuse it across reruns,
+    instead of setting up a new HTTP connection pool every time.
+    """
+    return OpenAI(api_key=OPENAI_API_KEY)
+
+
+client = get_openai() if OPENAI_API_KEY else None
 
 # Where our database lives
 DB_PATH = "diabetes_health.db"
 
-# We block these database operations to keep the data safe
-# (we only want to read data, not modify or delete it)
-DANGEROUS_KEYWORDS = ["DELETE", "DROP", "TRUNCATE", "ALTER", "UPDATE", "INSERT"]
 
+# The only things a query is allowed to do: read tables, call functions
+# (like COUNT or AVG), and use SELECTs, subqueries and recursive CTEs
+READ_ONLY_ACTIONS = {
+    sqlite3.SQLITE_SELECT,
+    sqlite3.SQLITE_READ,
+    sqlite3.SQLITE_FUNCTION,
+    sqlite3.SQLITE_RECURSIVE,
+}
 
-def is_safe_query(query):
+
+def _read_only_authorizer(action, arg1, arg2, db_name, trigger_name):
     """
-    Check if a database query is safe to run.
-    We only allow SELECT queries to keep the data protected.
+    SQLite calls this while preparing every statement on our connection.
+    Anything that isn't a plain read is denied before it can run,
+    however the query is written.
     """
-    query_upper = query.upper().strip()
+    if action in READ_ONLY_ACTIONS:
+        return sqlite3.SQLITE_OK
 
-    # Check for dangerous operations that could modify or delete data
-    for keyword in DANGEROUS_KEYWORDS:
-        if keyword in query_upper:
-            logger.warning(f"Whoa! Blocked a dangerous operation: {keyword}")
-            return False, f"Sorry, {keyword} operations aren't allowed for safety reasons"
+    # We still need PRAGMA table_info to describe the schema to the AI
+    if action == sqlite3.SQLITE_PRAGMA and arg1 == "table_info":
+        return sqlite3.SQLITE_OK
 
-    # Make sure it's a SELECT query (read-only)
-    if not query_upper.startswith("SELECT"):
-        logger.warning("Blocked a non-SELECT query")
-        return False, "We can only run SELECT queries to keep the data safe"
+    return sqlite3.SQLITE_DENY
 
-    return True, None
 
+def _open_conn():
+    """
+    Open a read-only connection tuned for our workload.
+    """
+    # mode=ro: if the database file is missing, fail instead of
+    # quietly creating an empty one
+    conn = sqlite3.connect(f"file:{DB_PATH}?mode=ro", uri=True, check_same_thread=False)
+    conn.execute("PRAGMA query_only=1")
+    # Keep the whole dataset in memory after the first scan:
+    # 256 MB page cache, memory-mapped reads, in-memory temp tables for sorting
+    conn.execute("PRAGMA cache_size=-262144")
+    conn.execute("PRAGMA mmap_size=1073741824")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    # From here on, SQLite only lets this connection read.
+    # SQLite calls the authorizer while holding the connection's lock, so a
+    # connection must never be shared between threads (see borrow_conn)
+    conn.set_authorizer(_read_only_authorizer)
+    return conn
+
+
+@st.cache_resource(max_entries=1)
+def get_conn_pool(db_version):
+    """
+    Keep idle database connections around between reruns.
+    Reusing them keeps SQLite's page and statement caches warm instead of
+    starting from scratch on every query.
+    There's one pool per version of the database file, so after a rebuild
+    we open fresh connections and drop the ones still reading the old file.
+    """
+    return queue.SimpleQueue()
 
-def get_database_schema():
+
+@contextmanager
+def borrow_conn(db_version):
     """
-    Get the structure of our database (what tables and columns exist).
+    Borrow a database connection for the length of a `with` block.
+    Each connection is only used by one thread at a time, so parallel
+    tool calls (and different users) run side by side instead of
+    queueing on a single shared connection.
+    """
+    pool = get_conn_pool(db_version)
+    try:
+        conn = pool.get_nowait()
+    except queue.Empty:
+        conn = _open_conn()
 
-    Important: This only returns the database structure, NOT any actual patient data.
-    The AI uses this to understand what questions it can answer.
+    try:
+        yield conn
+    finally:
+        pool.put(conn)
+
+
+def get_db_version():
+    """
+    Get the database file's last-modified time.
+    Cached results are keyed on this, so they refresh automatically
+    if download_real_data.py rebuilds the database.
+    """
+    try:
+        return os.path.getmtime(DB_PATH)
+    except OSError:
+        return None
+
+
+# We block these database operations to keep the data safe
+# (we only want to read data, not modify or delete it)
+DANGEROUS_STATEMENTS = {
+    exp.Delete: "DELETE",
+    exp.Drop: "DROP",
+    exp.TruncateTable: "TRUNCATE",
+    exp.Alter: "ALTER",
+    exp.Update: "UPDATE",
+    exp.Insert: "INSERT",
+}
+
+# Where answers to past questions are saved, and how long they're kept
+ANSWER_CACHE_DIR = ".qcache"
+ANSWER_CACHE_TTL = 86400
+
+# Only answers built from these read-only tools can be replayed later.
+# Anything else (like creating a support ticket) has to really run each time
+CACHEABLE_TOOLS = {"execute_sql_query", "get_database_statistics"}
+
+# Pre-computed summary tables built by download_real_data.py
+SUMMARY_TABLES = ["diabetes_by_age", "health_risk_summary"]
+
+# The most rows we ever send back for display
+MAX_RESULT_ROWS = 100
+
+
+def find_dangerous_operation(query):
+    """
+    Look for an operation that would modify or delete data (DELETE, DROP, ...)
+    anywhere in a query, and return its name, or None if there isn't one.
+
+    The query is actually parsed, so words inside comments or column names
+    (like "UPDATED_AT") don't trip the check, but hidden statements do.
+    """
+    try:
+        statements = sqlglot.parse(query, read="sqlite")
+    except SqlglotError:
+        return None
+
+    for statement in statements:
+        if statement is None:
+            continue
+        for node in statement.walk():
+            keyword = DANGEROUS_STATEMENTS.get(type(node))
+            if keyword:
+                return keyword
+
+    return None
+
+
+def trim_query_end(query):
+    """
+    Remove trailing semicolons and comments from a query, so it can be
+    wrapped inside another SELECT. The query is tokenized, so a ";" or "--"
+    inside a string isn't mistaken for the end of it.
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
+        tokens = sqlglot.tokenize(query, read="sqlite")
+    except SqlglotError:
+        # Leave it as-is and let SQLite report what's wrong
+        return query
+
+    for token in reversed(tokens):
+        if token.token_type != TokenType.SEMICOLON:
+            return query[:token.end + 1]
+
+    return query
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _cached_schema(db_version):
+    """
+    Build the schema description once and keep it in memory.
+    The database structure never changes while the app is running,
+    so there's no need to ask SQLite for it on every question.
+    """
+    with borrow_conn(db_version) as conn:
         cursor = conn.cursor()
 
         schema = "Database Schema:\n\n"
@@ -84,7 +235,15 @@ def get_database_schema():
             for col in columns:
                 schema += f"  - {col[1]} ({col[2]})\n"
 
-        # Also check if there are any pre-made views (like summary tables)
+        # Point out the pre-made summary tables so the AI can use them directly
+        summaries = [table for table in tables if table in SUMMARY_TABLES]
+
+        if summaries:
+            schema += "\nSummaries (pre-computed, fast to query):\n"
+            for summary in summaries:
+                schema += f"  - {summary}\n"
+
+        # Also check if there are any pre-made views
         cursor.execute("SELECT name FROM sqlite_master WHERE type='view'")
         views = [row[0] for row in cursor.fetchall()]
 
@@ -93,7 +252,18 @@ def get_database_schema():
             for view in views:
                 schema += f"  - {view}\n"
 
-        conn.close()
+    return schema
+
+
+def get_database_schema():
+    """
+    Get the structure of our database (what tables and columns exist).
+
+    Important: This only returns the database structure, NOT any actual patient data.
+    The AI uses this to understand what questions it can answer.
+    """
+    try:
+        schema = _cached_schema(get_db_version())
         logger.info("Successfully got the database structure")
         return schema
 
@@ -102,6 +272,18 @@ def get_database_schema():
         return None
 
 
+@st.cache_data(ttl=3600, max_entries=256, show_spinner=False)
+def _cached_query(limited_query, db_version):
+    """
+    Run a row-limited query and keep its results in memory, so the same
+    SQL asked again (by the AI or an example button) skips the database.
+    """
+    with borrow_conn(db_version) as conn:
+        cursor = conn.execute(limited_query)
+        columns = [d[0] for d in cursor.description]
+        return columns, cursor.fetchall()
+
+
 def execute_sql_query(sql_query):
     """
     Run a database query and return the results.
@@ -109,31 +291,75 @@ def execute_sql_query(sql_query):
     """
     logger.info(f"Running query: {sql_query}")
 
-    # First, make sure the query is safe to run
-    is_safe, error_msg = is_safe_query(sql_query)
-    if not is_safe:
-        logger.error(f"Query blocked for safety: {error_msg}")
-        return json.dumps({"error": error_msg, "blocked": True})
-
+    # No need to check the query up front - the connection's
+    # authorizer makes SQLite itself refuse anything that isn't a read
     try:
-        # Connect to the database and run the query
-        conn = sqlite3.connect(DB_PATH)
-        df = pd.read_sql_query(sql_query, conn)
-        conn.close()
+        # Let SQLite stop after the rows we'll actually show (plus one to
+        # detect truncation). The newline keeps a "--" comment we couldn't
+        # trim from swallowing the closing parenthesis.
+        limited_query = f"SELECT * FROM ({trim_query_end(sql_query)}\n) LIMIT {MAX_RESULT_ROWS + 1}"
+
+        # Run it (or reuse the rows if this exact SQL has run before)
+        columns, rows = _cached_query(limited_query, get_db_version())
+        data = [dict(zip(columns, row)) for row in rows[:MAX_RESULT_ROWS]]
 
         # Package up the results
         result = {
             "success": True,
-            "rows": len(df),
-            "data": df.to_dict('records')[:100]  # We limit to 100 rows for display
+            "rows": len(data),
+            "truncated": len(rows) > MAX_RESULT_ROWS,
+            "data": data
         }
 
-        logger.info(f"Query worked! Got {len(df)} rows")
-        return json.dumps(result)
+        logger.info(f"Query worked! Got {len(data)} rows")
+        return result
+
+    except sqlite3.DatabaseError as e:
+        # If it failed because it tried to change data (refused by the
+        # authorizer, or a DELETE/DROP/... hidden in it), explain that clearly.
+        # Anything else, like a typo, is reported as a normal error
+        keyword = find_dangerous_operation(sql_query)
+        if keyword or str(e) == "not authorized":
+            if keyword:
+                logger.warning(f"Whoa! Blocked a dangerous operation: {keyword}")
+                error_msg = f"Sorry, {keyword} operations aren't allowed for safety reasons"
+            else:
+                error_msg = "We can only run SELECT queries to keep the data safe"
+            logger.error(f"Query blocked for safety: {error_msg}")
+            return {"error": error_msg, "blocked": True}
+
+        logger.error(f"Query failed: {e}")
+        return {"error": str(e), "success": False}
 
     except Exception as e:
         logger.error(f"Query failed: {e}")
-        return json.dumps({"error": str(e), "success": False})
+        return {"error": str(e), "success": False}
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _cached_statistics(db_version):
+    """
+    Compute the overall statistics once and keep them in memory.
+    The survey data is read-only, so these numbers never change.
+    """
+    # Get every number in a single pass over the table
+    with borrow_conn(db_version) as conn:
+        total, diabetic_count, avg_bmi, high_bp_count, smoker_count = conn.execute("""
+            SELECT COUNT(*), SUM(Diabetes_binary), AVG(BMI), SUM(HighBP), SUM(Smoker)
+            FROM patient_health_data
+        """).fetchone()
+
+    stats = {
+        'total_patients': total,
+        'diabetic_patients': diabetic_count,
+        'diabetes_rate_pct': round(diabetic_count / total * 100, 2),
+        'avg_bmi': round(avg_bmi, 1),
+        'high_bp_rate_pct': round(high_bp_count / total * 100, 1),
+        'smoker_rate_pct': round(smoker_count / total * 100, 1),
+    }
+
+    logger.info(f"Got stats for {stats['total_patients']:,} patients")
+    return stats
 
 
 def get_database_statistics():
@@ -144,43 +370,11 @@ def get_database_statistics():
     logger.info("Getting overall database statistics")
 
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-
-        stats = {}
-
-        # Count total patients
-        cursor.execute("SELECT COUNT(*) FROM patient_health_data")
-        stats['total_patients'] = cursor.fetchone()[0]
-
-        # Count how many have diabetes
-        cursor.execute("SELECT SUM(Diabetes_binary) FROM patient_health_data")
-        diabetic_count = cursor.fetchone()[0]
-        stats['diabetic_patients'] = diabetic_count
-        stats['diabetes_rate_pct'] = round(diabetic_count / stats['total_patients'] * 100, 2)
-
-        # Calculate average BMI
-        cursor.execute("SELECT AVG(BMI) FROM patient_health_data")
-        stats['avg_bmi'] = round(cursor.fetchone()[0], 1)
-
-        # Calculate high blood pressure rate
-        cursor.execute("SELECT SUM(HighBP) FROM patient_health_data")
-        high_bp_count = cursor.fetchone()[0]
-        stats['high_bp_rate_pct'] = round(high_bp_count / stats['total_patients'] * 100, 1)
-
-        # Calculate smoker rate
-        cursor.execute("SELECT SUM(Smoker) FROM patient_health_data")
-        smoker_count = cursor.fetchone()[0]
-        stats['smoker_rate_pct'] = round(smoker_count / stats['total_patients'] * 100, 1)
-
-        conn.close()
-
-        logger.info(f"Got stats for {stats['total_patients']:,} patients")
-        return json.dumps(stats)
+        return _cached_statistics(get_db_version())
 
     except Exception as e:
         logger.error(f"Couldn't get statistics: {e}")
-        return json.dumps({"error": str(e)})
+        return {"error": str(e)}
 
 
 def create_support_ticket(issue_description, user_question=""):
@@ -199,11 +393,11 @@ def create_support_ticket(issue_description, user_question=""):
     logger.info(f"Created: {datetime.now()}")
     logger.info("=" * 50)
 
-    return json.dumps({
+    return {
         "ticket_id": ticket_id,
         "status": "created",
         "message": "Your support ticket has been created and logged for review."
-    })
+    }
 
 
 # Define what tools the AI can use
@@ -270,23 +464,59 @@ available_functions = {
 }
 
 
-def process_user_query(user_question):
+# The example questions in the sidebar always need the same data,
+# so we answer them with a fixed tool call and skip the AI entirely
+CANNED_QUESTIONS = {
+    "Show me diabetes rates by age group": (
+        "execute_sql_query",
+        {"sql_query": "SELECT * FROM diabetes_by_age"}
+    ),
+    "Is there a connection between BMI and diabetes?": (
+        "execute_sql_query",
+        {"sql_query": "SELECT Diabetes_binary AS has_diabetes, COUNT(*) AS patients, "
+                      "ROUND(AVG(BMI), 1) AS avg_bmi FROM patient_health_data GROUP BY Diabetes_binary"}
+    ),
+    "How many people have high blood pressure?": (
+        "execute_sql_query",
+        {"sql_query": "SELECT SUM(HighBP) AS high_bp_patients, "
+                      "ROUND(AVG(HighBP) * 100, 1) AS high_bp_rate_pct FROM patient_health_data"}
+    ),
+    "Compare health by general health rating": (
+        "execute_sql_query",
+        {"sql_query": "SELECT * FROM health_risk_summary"}
+    ),
+    "Do smokers have higher diabetes rates?": (
+        "execute_sql_query",
+        {"sql_query": "SELECT Smoker AS is_smoker, COUNT(*) AS patients, "
+                      "ROUND(AVG(Diabetes_binary) * 100, 2) AS diabetes_rate_pct FROM patient_health_data GROUP BY Smoker"}
+    ),
+    "Give me an overview of the database": ("get_database_statistics", {}),
+}
+
+
+def answer_canned_question(user_question):
     """
-    Process a user's question and get an AI-powered answer.
-    The AI will automatically decide which tools to use.
+    Answer one of the example questions without asking the AI.
+    Returns the same (tools used, answer) pair as process_user_query.
     """
-    logger.info(f"Processing question: {user_question}")
+    function_name, function_args = CANNED_QUESTIONS[user_question]
+    logger.info(f"Example question, calling {function_name} directly")
 
-    # Get the database structure (but not the actual data)
-    schema = get_database_schema()
-    if not schema:
-        return None, "Sorry, I couldn't access the database structure right now."
+    executed_tools = [{
+        "name": function_name,
+        "args": function_args,
+        "result": available_functions[function_name](**function_args)
+    }]
+
+    return executed_tools, answer_without_ai(executed_tools)
 
-    system_prompt = f"""You're a friendly health data assistant helping people explore CDC diabetes survey data.
 
-{schema}
+# The AI's instructions never change, so they're built once here.
+# Keeping the whole system prompt identical on every request lets
+# OpenAI reuse its cached copy instead of reprocessing it each time.
+SYSTEM_PROMPT_INTRO = "You're a friendly health data assistant helping people explore CDC diabetes survey data."
 
-What you're working with:
+SYSTEM_PROMPT_GUIDE = """What you're working with:
 - Real survey data from the CDC (2014 BRFSS)
 - 253,680 actual patient responses
 - 21 different health indicators
@@ -334,8 +564,130 @@ How to help:
 - Use create_support_ticket if you can't help
 - Always add LIMIT to queries that might return lots of rows
 - When querying Age, ALWAYS use the category numbers (1-13), never use actual age numbers
+- When a question has multiple parts, combine them into a single SQL query using UNION ALL with a `group_label` literal column, and answer every part from that one tool call
 - Explain your findings in plain English, converting Age categories back to age ranges"""
 
+
+def get_system_prompt():
+    """
+    Put together the full instructions for the AI: who it is, the database
+    structure (but not the actual data), and how to read the data.
+    """
+    schema = get_database_schema()
+    if not schema:
+        return None
+
+    return f"{SYSTEM_PROMPT_INTRO}\n\n{schema}\n\n{SYSTEM_PROMPT_GUIDE}"
+
+
+@st.cache_resource
+def get_answer_cache():
+    """
+    Open the on-disk cache of answered questions.
+    It survives app restarts, so repeat questions (like the example
+    buttons) are answered instantly without calling the AI again.
+    """
+    return Cache(ANSWER_CACHE_DIR, eviction_policy="least-recently-used")
+
+
+def question_cache_key(user_question):
+    """
+    Normalize a question so small differences in case or spacing
+    still find the same saved answer. The database version is part of
+    the key, so rebuilding the database retires every old answer.
+    """
+    return (get_db_version(), " ".join(user_question.lower().split()))
+
+
+def remember_answer(cache_key, executed_tools, answer):
+    """
+    Save a finished answer so the same question can skip the AI next time.
+    Answers built on a failed tool call aren't saved, so the question
+    gets a fresh try instead. Neither are answers from tools that do
+    something (like opening a support ticket), since replaying them
+    would skip the real action.
+    """
+    for tool in executed_tools or []:
+        if tool['name'] not in CACHEABLE_TOOLS or 'error' in tool['result']:
+            return
+
+    get_answer_cache().set(cache_key, (executed_tools, answer), expire=ANSWER_CACHE_TTL)
+
+
+def log_token_usage(usage):
+    """
+    Log how many tokens an AI call used, so we can keep an eye on cost.
+    """
+    if usage:
+        logger.info(f"Tokens used: {usage.prompt_tokens} prompt + {usage.completion_tokens} answer")
+
+
+def answer_without_ai(executed_tools):
+    """
+    Build the answer ourselves when the tool results don't need explaining:
+    a plain statistics overview, a failed query, or a query with no rows.
+    Returns None when the AI should write the answer.
+    """
+    if len(executed_tools) != 1:
+        return None
+
+    tool = executed_tools[0]
+    result = tool['result']
+
+    if tool['name'] == 'get_database_statistics' and 'total_patients' in result:
+        return (
+            f"The database holds {result['total_patients']:,} patient responses. "
+            f"{result['diabetic_patients']:,} of them ({result['diabetes_rate_pct']}%) have diabetes or prediabetes. "
+            f"The average BMI is {result['avg_bmi']}, {result['high_bp_rate_pct']}% have high blood pressure, "
+            f"and {result['smoker_rate_pct']}% are smokers."
+        )
+
+    if tool['name'] == 'execute_sql_query':
+        if not result.get('success'):
+            return f"Sorry, I couldn't get that data: {result.get('error', 'Unknown error')}"
+        if result.get('rows') == 0:
+            return "The query ran fine, but no records matched your question."
+
+    return None
+
+
+def stream_answer(stream, cache_key, executed_tools):
+    """
+    Pass along the AI's answer piece by piece as it arrives,
+    then save the complete answer once it's finished.
+    """
+    pieces = []
+    for chunk in stream:
+        # The last chunk carries the token counts instead of text
+        if chunk.usage:
+            log_token_usage(chunk.usage)
+        if chunk.choices and chunk.choices[0].delta.content:
+            pieces.append(chunk.choices[0].delta.content)
+            yield chunk.choices[0].delta.content
+
+    remember_answer(cache_key, executed_tools, "".join(pieces))
+    logger.info("Query processing complete")
+
+
+def process_user_query(user_question):
+    """
+    Process a user's question and get an AI-powered answer.
+    The AI will automatically decide which tools to use.
+    """
+    logger.info(f"Processing question: {user_question}")
+
+    # We may have answered this exact question before
+    cache_key = question_cache_key(user_question)
+    cached = get_answer_cache().get(cache_key)
+    if cached is not None:
+        logger.info("Found a saved answer for this question")
+        return cached
+
+    # Get the AI's instructions, including the database structure
+    system_prompt = get_system_prompt()
+    if not system_prompt:
+        return None, "Sorry, I couldn't access the database structure right now."
+
     messages = [
         {"role": "system", "content": system_prompt},
         {"role": "user", "content": user_question}
@@ -351,28 +703,39 @@ How to help:
             tool_choice="auto"
         )
 
+        log_token_usage(response.usage)
+
         response_message = response.choices[0].message
         tool_calls = response_message.tool_calls
 
         # Sometimes the AI can answer without using any tools
         if not tool_calls:
             logger.info("AI answered directly without tools")
+            remember_answer(cache_key, None, response_message.content)
             return None, response_message.content
 
         # The AI wants to use some tools - let's run them
         messages.append(response_message)
         executed_tools = []
 
-        for tool_call in tool_calls:
-            function_name = tool_call.function.name
-            function_args = json.loads(tool_call.function.arguments)
+        # Start every requested tool at once - they're independent lookups,
+        # so there's no reason to wait for one before starting the next
+        with ThreadPoolExecutor(max_workers=min(4, len(tool_calls))) as pool:
+            pending = []
+            for tool_call in tool_calls:
+                function_name = tool_call.function.name
+                function_args = json.loads(tool_call.function.arguments)
+
+                logger.info(f"AI is calling: {function_name}")
+                logger.info(f"  With arguments: {function_args}")
 
-            logger.info(f"AI is calling: {function_name}")
-            logger.info(f"  With arguments: {function_args}")
+                # Run the function the AI requested
+                function_to_call = available_functions[function_name]
+                future = pool.submit(function_to_call, **function_args)
+                pending.append((tool_call, function_name, function_args, future))
 
-            # Run the function the AI requested
-            function_to_call = available_functions[function_name]
-            function_response = function_to_call(**function_args)
+        for tool_call, function_name, function_args, future in pending:
+            function_response = future.result()
 
             # Keep track of what we did
             executed_tools.append({
@@ -381,31 +744,50 @@ How to help:
                 "result": function_response
             })
 
-            # Send the results back to the AI
+            # Send the results back to the AI (in the order it asked for them)
             messages.append({
                 "tool_call_id": tool_call.id,
                 "role": "tool",
                 "name": function_name,
-                "content": function_response
+                "content": json.dumps(function_response, default=str)
             })
 
-        # Now get the AI's final answer based on the tool results
+        # Some results speak for themselves - no need to ask the AI again
+        quick_answer = answer_without_ai(executed_tools)
+        if quick_answer:
+            logger.info("Answered from the tool results, skipped the second AI call")
+            remember_answer(cache_key, executed_tools, quick_answer)
+            return executed_tools, quick_answer
+
+        # Now get the AI's final answer based on the tool results,
+        # streamed so the user sees it as soon as the AI starts writing
         logger.info("Getting AI's final answer...")
         final_response = client.chat.completions.create(
             model="gpt-4o-mini",
-            messages=messages
+            messages=messages,
+            stream=True,
+            stream_options={"include_usage": True}
         )
 
-        final_message = final_response.choices[0].message.content
-        logger.info("Query processing complete")
-
-        return executed_tools, final_message
+        return executed_tools, stream_answer(final_response, cache_key, executed_tools)
 
     except Exception as e:
         logger.error(f"Something went wrong: {e}")
         return None, f"Sorry, I ran into a problem: {str(e)}"
 
 
+def process_user_queries(questions):
+    """
+    Answer several questions in one go (handy for bulk runs like evaluations).
+    They're sent together as one numbered list, so the long system prompt
+    is only paid for once instead of once per question.
+    """
+    combined_question = "Answer each of these questions separately, numbering your answers to match:\n"
+    combined_question += "\n".join(f"{i}. {question}" for i, question in enumerate(questions, 1))
+
+    return process_user_query(combined_question)
+
+
 def main():
     st.set_page_config(
         page_title="CDC Diabetes Data Explorer",
@@ -427,35 +809,21 @@ def main():
 
         # Show a snapshot of the data
         try:
-            conn = sqlite3.connect(DB_PATH)
-
-            total = pd.read_sql_query("SELECT COUNT(*) as c FROM patient_health_data", conn).iloc[0]['c']
-            st.metric("Total Patients", f"{total:,}")
-
-            diabetic = pd.read_sql_query("SELECT SUM(Diabetes_binary) as c FROM patient_health_data", conn).iloc[0]['c']
-            st.metric("With Diabetes", f"{diabetic:,}", f"{diabetic/total*100:.1f}%")
-
-            avg_bmi = pd.read_sql_query("SELECT AVG(BMI) as a FROM patient_health_data", conn).iloc[0]['a']
-            st.metric("Average BMI", f"{avg_bmi:.1f}")
-
-            high_bp = pd.read_sql_query("SELECT SUM(HighBP) as c FROM patient_health_data", conn).iloc[0]['c']
-            st.metric("High Blood Pressure", f"{high_bp/total*100:.1f}%")
+            # Same cached numbers the AI's statistics tool uses
+            stats = _cached_statistics(get_db_version())
 
-            conn.close()
+            st.metric("Total Patients", f"{stats['total_patients']:,}")
+            st.metric("With Diabetes", f"{stats['diabetic_patients']:,}", f"{stats['diabetes_rate_pct']:.1f}%")
+            st.metric("Average BMI", f"{stats['avg_bmi']:.1f}")
+            st.metric("High Blood Pressure", f"{stats['high_bp_rate_pct']:.1f}%")
         except Exception as e:
             st.error(f"Couldn't load stats: {e}")
 
         st.header("Example Questions")
 
         # Example questions to get started
-        samples = [
-            "Show me diabetes rates by age group",
-            "Is there a connection between BMI and diabetes?",
-            "How many people have high blood pressure?",
-            "Compare health by general health rating",
-            "Do smokers have higher diabetes rates?",
-            "Give me an overview of the database",
-        ]
+        # These are answered straight from the database (see CANNED_QUESTIONS)
+        samples = list(CANNED_QUESTIONS)
 
         for q in samples:
             if st.button(q, key=q):
@@ -481,7 +849,10 @@ def main():
         st.session_state.current_question = ""
 
         with st.spinner("Processing your question..."):
-            tool_results, ai_response = process_user_query(user_question)
+            if user_question in CANNED_QUESTIONS:
+                tool_results, ai_response = answer_canned_question(user_question)
+            else:
+                tool_results, ai_response = process_user_query(user_question)
 
         # Show what happened behind the scenes
         if tool_results:
@@ -500,16 +871,17 @@ def main():
                     st.divider()
 
                     # Show the results
-                    result = json.loads(tool['result'])
+                    result = tool['result']
 
                     if tool['name'] == 'execute_sql_query':
                         if result.get('success'):
                             st.markdown(f"**Query Results:** {result.get('rows', 0)} rows returned")
                             if result.get('data'):
-                                df = pd.DataFrame(result['data'])
-                                st.dataframe(df, use_container_width=True)
-                                if result['rows'] > len(df):
-                                    st.caption(f"Showing first {len(df)} of {result['rows']} rows")
+                                # Streamlit takes the rows as-is, and copes with
+                                # columns that mix types (e.g. from UNION ALL)
+                                st.dataframe(result['data'], use_container_width=True)
+                                if result.get('truncated'):
+                                    st.caption(f"Showing only the first {len(result['data'])} rows")
                             else:
                                 st.info("Query executed successfully but returned no data")
                         else:
@@ -543,7 +915,14 @@ def main():
         # Show the answer
         if ai_response:
             st.subheader("Answer")
-            st.write(ai_response)
+            if isinstance(ai_response, str):
+                st.write(ai_response)
+            else:
+                try:
+                    st.write_stream(ai_response)
+                except Exception as e:
+                    logger.error(f"Something went wrong while streaming the answer: {e}")
+                    st.error(f"Sorry, I ran into a problem: {str(e)}")
 
     # Help button
     st.divider()
@@ -552,11 +931,10 @@ def main():
     with col2:
         if st.button("Need Help?"):
             with st.spinner("Creating support ticket..."):
-                result = create_support_ticket(
+                ticket_info = create_support_ticket(
                     "User requested assistance",
                     user_question if user_question else "General inquiry"
                 )
-                ticket_info = json.loads(result)
                 st.success(f"{ticket_info['message']}\n\nTicket: {ticket_info['ticket_id']}")
 
     # Footer
@@ -5,6 +5,7 @@ This script downloads genuine health survey data from the CDC's 2014 study.
 Downloads 253,680 patient survey responses - this may take a minute.
 """
 
+import os
 import sqlite3
 from ucimlrepo import fetch_ucirepo
 
@@ -29,26 +30,72 @@ print(f"\nAvailable columns:")
 for col in df.columns:
     print(f"  - {col}")
 
+# Every indicator except BMI is a small whole number (yes/no flags,
+# 1-13 categories, 0-30 day counts), so store them as compact integers
+for col in df.columns:
+    if col != 'BMI':
+        df[col] = df[col].astype('int8')
+
 # Create the SQLite database
 print("\nCreating database: diabetes_health.db")
-conn = sqlite3.connect("diabetes_health.db")
 
-# Save all the data to the database
-df.to_sql('patient_health_data', conn, if_exists='replace', index=False)
+# Start from a fresh file, so an older or half-built database
+# (like one with views instead of summary tables) can't get in the way
+for path in ["diabetes_health.db", "diabetes_health.db-wal", "diabetes_health.db-shm"]:
+    if os.path.exists(path):
+        os.remove(path)
 
-# Add additional database features
-cursor = conn.cursor()
+conn = sqlite3.connect("diabetes_health.db")
 
-# Add unique patient ID column
-cursor.execute("ALTER TABLE patient_health_data ADD COLUMN patient_id INTEGER")
-cursor.execute("UPDATE patient_health_data SET patient_id = rowid")
+# The app only ever reads this database, so use WAL mode and skip
+# the extra disk syncs and give it plenty of memory while we're building it
+conn.execute("PRAGMA journal_mode=WAL")
+conn.execute("PRAGMA synchronous=OFF")
+conn.execute("PRAGMA temp_store=MEMORY")
+conn.execute("PRAGMA cache_size=-100000")
 
-# Create pre-computed views for common queries
-# These improve query performance for frequently asked questions
+cursor = conn.cursor()
 
-# View 1: Diabetes statistics grouped by age
-cursor.execute("""
-    CREATE VIEW diabetes_by_age AS
+# Give every patient a unique ID up front. As the INTEGER PRIMARY KEY it
+# is just SQLite's own row number, so it costs no extra storage
+df.insert(0, 'patient_id', range(1, len(df) + 1))
+
+# Create the table with explicit column types, then save all the data to it
+column_types = {'patient_id': 'INTEGER PRIMARY KEY', 'BMI': 'REAL'}
+column_defs = ", ".join(f"{col} {column_types.get(col, 'INTEGER')}" for col in df.columns)
+cursor.execute(f"CREATE TABLE patient_health_data ({column_defs})")
+df.to_sql('patient_health_data', conn, if_exists='append', index=False)
+
+# Add the indexes and pre-computed summary tables in a single transaction
+cursor.executescript("""
+    BEGIN;
+
+    -- Index the columns people filter and group by most often
+    -- so SQLite doesn't have to scan every row for those questions
+    CREATE INDEX idx_age ON patient_health_data(Age);
+    CREATE INDEX idx_genhlth ON patient_health_data(GenHlth);
+    CREATE INDEX idx_diabetes_binary ON patient_health_data(Diabetes_binary);
+    CREATE INDEX idx_highbp ON patient_health_data(HighBP);
+    CREATE INDEX idx_smoker ON patient_health_data(Smoker);
+
+    -- Covering index for the by-age summaries (answered from the index alone)
+    CREATE INDEX idx_age_diab_bmi ON patient_health_data(Age, Diabetes_binary, BMI);
+
+    -- The survey data never changes, so we store the results of common
+    -- queries once instead of re-aggregating every row each time.
+    -- The columns are declared with types so the schema shown to the AI
+    -- still says what each one holds
+
+    -- Summary 1: Diabetes statistics grouped by age
+    CREATE TABLE diabetes_by_age (
+        age_group INTEGER,
+        total_patients INTEGER,
+        diabetic_patients INTEGER,
+        diabetes_rate_pct REAL,
+        avg_bmi REAL,
+        high_bp_pct REAL
+    );
+    INSERT INTO diabetes_by_age
     SELECT
         Age as age_group,
         COUNT(*) as total_patients,
@@ -58,12 +105,18 @@ cursor.execute("""
         ROUND(AVG(HighBP) * 100, 1) as high_bp_pct
     FROM patient_health_data
     GROUP BY Age
-    ORDER BY Age
-""")
-
-# View 2: Health metrics grouped by general health rating
-cursor.execute("""
-    CREATE VIEW health_risk_summary AS
+    ORDER BY Age;
+
+    -- Summary 2: Health metrics grouped by general health rating
+    CREATE TABLE health_risk_summary (
+        general_health_rating INTEGER,
+        patient_count INTEGER,
+        avg_bmi REAL,
+        high_bp_rate REAL,
+        high_cholesterol_rate REAL,
+        diabetes_rate REAL
+    );
+    INSERT INTO health_risk_summary
     SELECT
         GenHlth as general_health_rating,
         COUNT(*) as patient_count,
@@ -73,10 +126,10 @@ cursor.execute("""
         ROUND(AVG(Diabetes_binary) * 100, 2) as diabetes_rate
     FROM patient_health_data
     GROUP BY GenHlth
-    ORDER BY GenHlth
-""")
+    ORDER BY GenHlth;
 
-conn.commit()
+    COMMIT;
+""")
 
 # Display database contents
 print(f"\nDatabase created successfully")
@@ -85,12 +138,9 @@ cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
 for table in cursor.fetchall():
     print(f"  Table: {table[0]}")
 
-cursor.execute("SELECT name FROM sqlite_master WHERE type='view'")
-views = cursor.fetchall()
-if views:
-    print(f"\nPre-computed views:")
-    for view in views:
-        print(f"  View: {view[0]}")
+print(f"\nPre-computed summary tables:")
+for summary in ["diabetes_by_age", "health_risk_summary"]:
+    print(f"  Summary: {summary}")
 
 # Display summary statistics
 cursor.execute("SELECT COUNT(*) FROM patient_health_data")
@@ -6,13 +6,21 @@ import os
 from openai import OpenAI
 from dotenv import load_dotenv
 import requests
-from PIL import Image
+from requests.adapters import HTTPAdapter
 from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
 
 load_dotenv()
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-client = OpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
+
+
+@st.cache_resource
+def get_openai():
+    return OpenAI(api_key=OPENAI_API_KEY)
+
+
+client = get_openai() if OPENAI_API_KEY else None
 
 
 def transcribe_audio(audio_file):
@@ -51,6 +59,32 @@ def enhance_prompt(user_text):
     return response.choices[0].message.content.strip()
 
 
+@st.cache_resource
+def get_http():
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+    return session
+
+
+@st.cache_resource
+def get_executor():
+    return ThreadPoolExecutor(max_workers=4)
+
+
+def start_enhance(text):
+    # Start enhancing in the background so the result is ready when the user clicks
+    if st.session_state.get('speculative_text') != text:
+        st.session_state['speculative_text'] = text
+        st.session_state['speculative_prompt'] = get_executor().submit(enhance_prompt, text)
+
+
+def take_enhanced(text):
+    future = st.session_state.pop('speculative_prompt', None)
+    if future is not None and st.session_state.pop('speculative_text', None) == text:
+        return future.result()
+    return enhance_prompt(text)
+
+
 def generate_image(prompt):
     try:
         response = client.images.generate(
@@ -61,10 +95,9 @@ def generate_image(prompt):
         )
 
         image_url = response.data[0].url
-        img_response = requests.get(image_url, timeout=30)
-        img_response.raise_for_status()
-
-        return Image.open(BytesIO(img_response.content))
+        with get_http().get(image_url, timeout=30, stream=True) as img_response:
+            img_response.raise_for_status()
+            return b"".join(img_response.iter_content(chunk_size=64 * 1024))
 
     except Exception as e:
         raise Exception(f"Image generation failed: {str(e)}")
@@ -145,6 +178,10 @@ def main():
                     status.update(label="Transcription failed", state="error")
                 else:
                     status.update(label="Transcription complete", state="complete")
+                    # Once a prompt is shown, step 5 speculates on its transcript instead.
+                    # Both at once would keep replacing each other's request
+                    if not st.session_state.get('prompt_ready', False):
+                        start_enhance(transcript)
 
                     st.markdown("### Step 3: Review Transcription")
 
@@ -176,7 +213,7 @@ def main():
                         with st.status("Enhancing prompt...", expanded=True) as enhance_status:
                             try:
                                 st.write("Using GPT-4o-mini to enhance prompt...")
-                                enhanced = enhance_prompt(edited_transcript)
+                                enhanced = take_enhanced(edited_transcript)
                                 enhance_status.update(label="Prompt enhanced", state="complete")
 
                                 st.session_state['pending_transcript'] = edited_transcript
@@ -191,6 +228,7 @@ def main():
                     if st.session_state.get('prompt_ready', False):
                         st.markdown("---")
                         st.markdown("### Step 5: Review Enhanced Prompt")
+                        start_enhance(st.session_state['pending_transcript'])
 
                         with st.expander("View Data", expanded=True):
                             st.markdown("**Original Transcript:**")
@@ -230,7 +268,7 @@ def main():
                             if st.button("Try New", use_container_width=True):
                                 with st.status("Regenerating prompt...", expanded=True) as regen_status:
                                     try:
-                                        enhanced = enhance_prompt(st.session_state['pending_transcript'])
+                                        enhanced = take_enhanced(st.session_state['pending_transcript'])
                                         st.session_state['pending_prompt'] = enhanced
                                         regen_status.update(label="New prompt generated", state="complete")
                                         st.rerun()